@@ -0,0 +1,114 @@
+"""Тысячи простаивающих websocket в одном воркере GeventWebSocketWorker: память воркера и задержка get_rooms.
+
+Клиенты — сырой Engine.IO поверх websocket-client в гринлетах, чтобы тысячи соединений держал один процесс.
+
+python bench/idle_sockets.py [путь к GChat.py] [ступени через запятую]
+"""
+from gevent import monkey
+monkey.patch_all()
+
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import gevent
+import requests
+import websocket
+
+src = os.path.abspath(sys.argv[1] if len(sys.argv) > 1 else os.path.join(os.path.dirname(__file__), '..', 'GChat.py'))
+steps = [int(n) for n in (sys.argv[2] if len(sys.argv) > 2 else '0,1000,2000,4000').split(',')]
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def worker_rss_mb(master_pid):
+    children = subprocess.run(['pgrep', '-P', str(master_pid)], capture_output=True, text=True).stdout.split()
+    total = 0
+    for pid in children:
+        with open(f'/proc/{pid}/status') as status:
+            total += next(int(line.split()[1]) for line in status if line.startswith('VmRSS'))
+    return total / 1024
+
+
+def open_socket(url, cookie):
+    ws = websocket.create_connection(url, header=[f'Cookie: {cookie}'])
+    ws.recv()
+    ws.send('40')
+    while not ws.recv().startswith('40'):
+        pass
+    return ws
+
+
+def keep_alive(ws):
+    # Отвечаем на ping Engine.IO, остальное читаем и выбрасываем
+    try:
+        while True:
+            if ws.recv() == '2':
+                ws.send('3')
+    except Exception:
+        pass
+
+
+def probe(ws, runs=50):
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        ws.send('42["get_rooms"]')
+        while True:
+            packet = ws.recv()
+            if packet == '2':
+                ws.send('3')
+            elif packet.startswith('42["rooms_list"'):
+                break
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    return timings[len(timings) // 2], timings[int(len(timings) * 0.95)]
+
+
+workdir = tempfile.mkdtemp(prefix='gchat_bench_')
+shutil.copy(src, os.path.join(workdir, 'GChat.py'))
+env = dict(os.environ, DISABLE_TUNNEL='true', FLASK_SECRET_KEY='bench')
+subprocess.run([sys.executable, '-c', 'from GChat import app, db, ensure_schema\nwith app.app_context():\n    db.create_all()\n    ensure_schema()'], cwd=workdir, env=env, check=True, capture_output=True)
+port = free_port()
+server = subprocess.Popen(['gunicorn', '--worker-class', 'geventwebsocket.gunicorn.workers.GeventWebSocketWorker', '-w', '1', '--worker-connections', '10000', '-b', f'127.0.0.1:{port}', '--graceful-timeout', '2', 'GChat:app'], cwd=workdir, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+try:
+    base = f'http://127.0.0.1:{port}'
+    for _ in range(300):
+        try:
+            requests.get(base + '/', timeout=1)
+            break
+        except requests.RequestException:
+            time.sleep(0.2)
+    http = requests.Session()
+    http.post(f'{base}/login', data={'username': 'idle', 'password': 'x'})
+    cookie = '; '.join(f'{k}={v}' for k, v in http.cookies.items())
+    url = f'ws://127.0.0.1:{port}/socket.io/?EIO=4&transport=websocket'
+    prober = open_socket(url, cookie)
+    idle = []
+    print('idle sockets   worker RSS   get_rooms p50 / p95')
+    for target in steps:
+        while len(idle) < target:
+            batch = [gevent.spawn(open_socket, url, cookie) for _ in range(min(200, target - len(idle)))]
+            gevent.joinall(batch)
+            for job in batch:
+                idle.append(job.value)
+                gevent.spawn(keep_alive, job.value)
+        gevent.sleep(2)
+        p50, p95 = probe(prober)
+        print(f'{len(idle):<14} {worker_rss_mb(server.pid):>7.0f} MB   {p50:.1f} / {p95:.1f} ms')
+finally:
+    server.terminate()
+    try:
+        server.wait(10)
+    except subprocess.TimeoutExpired:
+        server.kill()
+        server.wait()
+    shutil.rmtree(workdir, ignore_errors=True)
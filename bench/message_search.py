@@ -0,0 +1,62 @@
+"""search_messages на синтетическом корпусе: индекс FTS5 против LIKE-скана.
+
+python bench/message_search.py [путь к GChat.py] [число сообщений]
+"""
+import os
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+
+src = os.path.abspath(sys.argv[1] if len(sys.argv) > 1 else os.path.join(os.path.dirname(__file__), '..', 'GChat.py'))
+total = int(sys.argv[2]) if len(sys.argv) > 2 else 2000000
+
+workdir = tempfile.mkdtemp(prefix='gchat_bench_')
+shutil.copy(src, os.path.join(workdir, 'GChat.py'))
+os.chdir(workdir)
+sys.path.insert(0, workdir)
+os.environ.setdefault('DISABLE_TUNNEL', 'true')
+import GChat
+
+with GChat.app.app_context():
+    GChat.db.create_all()
+    GChat.ensure_schema()
+    database = GChat.db.engine.url.database
+http = GChat.app.test_client()
+http.post('/login', data={'username': 'alice', 'password': 'x'})
+client = GChat.socketio.test_client(GChat.app, flask_test_client=http)
+
+random.seed(1)
+words = [''.join(random.choice('абвгдежзиклмнопрстуфхцчшщэюя') for _ in range(random.randint(3, 9))) for _ in range(20000)]
+con = sqlite3.connect(database)
+con.executemany("INSERT INTO room(name, display_name, is_group, is_private) VALUES (?, ?, 1, 0)", [(f'r{i}', f'r{i}') for i in range(50)])
+started = time.time()
+batch = []
+for i in range(total):
+    batch.append((' '.join(random.choices(words, k=random.randint(4, 16))) + (' needle' if i % 100000 == 0 else ''), 1, random.randint(1, 50)))
+    if len(batch) == 100000:
+        con.executemany("INSERT INTO message(content, user_id, room_id) VALUES (?, ?, ?)", batch)
+        batch.clear()
+con.executemany("INSERT INTO message(content, user_id, room_id) VALUES (?, ?, ?)", batch)
+con.commit()
+print(f'inserted {total} messages in {time.time() - started:.1f} s')
+started = time.time()
+con.execute("INSERT INTO message_fts(message_fts) VALUES ('rebuild')")
+con.commit()
+print(f'fts rebuild {time.time() - started:.1f} s')
+
+def median_ms(query, runs=5):
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        client.emit('search_messages', {'query': query})
+        results = [e for e in client.get_received() if e['name'] == 'message_search_results'][-1]['args'][0]['results']
+        timings.append(time.perf_counter() - started)
+    return round(sorted(timings)[runs // 2] * 1000, 1), len(results)
+
+print('fts   rare', median_ms('needle'), 'common', median_ms(words[0]))
+GChat.message_search.backend = 'like'
+print('like  rare', median_ms('needle', 3), 'common', median_ms(words[0], 3))
+shutil.rmtree(workdir, ignore_errors=True)
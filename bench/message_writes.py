@@ -0,0 +1,55 @@
+"""Пропускная способность send_message: N отправителей по M сообщений в одну комнату.
+
+python bench/message_writes.py [путь к GChat.py] [потоков] [сообщений на поток]
+"""
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+src = os.path.abspath(sys.argv[1] if len(sys.argv) > 1 else os.path.join(os.path.dirname(__file__), '..', 'GChat.py'))
+threads, per_thread = (int(sys.argv[2]), int(sys.argv[3])) if len(sys.argv) > 3 else (32, 50)
+
+workdir = tempfile.mkdtemp(prefix='gchat_bench_')
+shutil.copy(src, os.path.join(workdir, 'GChat.py'))
+os.chdir(workdir)
+sys.path.insert(0, workdir)
+os.environ.setdefault('DISABLE_TUNNEL', 'true')
+import GChat
+
+with GChat.app.app_context():
+    GChat.db.create_all()
+    GChat.ensure_schema()
+    GChat.db.session.add(GChat.Room(name='general', display_name='general', is_group=True, is_private=False))
+    GChat.db.session.commit()
+
+clients = []
+for i in range(threads):
+    http = GChat.app.test_client()
+    http.post('/login', data={'username': f'u{i}', 'password': 'x'})
+    client = GChat.socketio.test_client(GChat.app, flask_test_client=http)
+    client.emit('join', {'room': 'general'})
+    clients.append(client)
+
+errors = []
+
+def sender(client):
+    for k in range(per_thread):
+        try:
+            client.emit('send_message', {'room': 'general', 'message': f'hello {k}'})
+        except Exception as e:
+            errors.append(repr(e))
+
+workers = [threading.Thread(target=sender, args=(client,)) for client in clients]
+started = time.perf_counter()
+for worker in workers:
+    worker.start()
+for worker in workers:
+    worker.join()
+elapsed = time.perf_counter() - started
+with GChat.app.app_context():
+    written = GChat.Message.query.count()
+print(f'threads={threads} messages={written} {written / elapsed:.0f} msg/s errors={len(errors)}')
+shutil.rmtree(workdir, ignore_errors=True)
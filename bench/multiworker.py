@@ -0,0 +1,124 @@
+"""Доставка между воркерами и пропускная способность при 1, 2 и 4 воркерах gunicorn за общей очередью Redis.
+
+Redis поднимается в процессе через fakeredis (pip install fakeredis), клиенты — python-socketio по websocket.
+
+python bench/multiworker.py [путь к GChat.py] [воркеры через запятую] [клиентов] [сообщений на отправителя]
+"""
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import requests
+import socketio
+from fakeredis import TcpFakeServer
+
+src = os.path.abspath(sys.argv[1] if len(sys.argv) > 1 else os.path.join(os.path.dirname(__file__), '..', 'GChat.py'))
+worker_counts = [int(n) for n in (sys.argv[2] if len(sys.argv) > 2 else '1,2,4').split(',')]
+clients_total = int(sys.argv[3]) if len(sys.argv) > 3 else 20
+per_sender = int(sys.argv[4]) if len(sys.argv) > 4 else 50
+senders_total = 4
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def wait_for(url, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            requests.get(url, timeout=1)
+            return
+        except requests.RequestException:
+            time.sleep(0.2)
+    raise RuntimeError(f'{url} did not come up')
+
+
+def connect(base, username):
+    http = requests.Session()
+    http.post(f'{base}/login', data={'username': username, 'password': 'x'})
+    client = socketio.Client(reconnection=False)
+    cookie = '; '.join(f'{k}={v}' for k, v in http.cookies.items())
+    client.connect(base, headers={'Cookie': cookie}, transports=['websocket'])
+    return http, client
+
+
+def run(workers, redis_url):
+    workdir = tempfile.mkdtemp(prefix='gchat_bench_')
+    shutil.copy(src, os.path.join(workdir, 'GChat.py'))
+    env = dict(os.environ, SOCKETIO_MESSAGE_QUEUE=redis_url, GCHAT_WORKERS=str(workers), DISABLE_TUNNEL='true', FLASK_SECRET_KEY='bench')
+    subprocess.run([sys.executable, '-c', 'from GChat import app, db, ensure_schema\nwith app.app_context():\n    db.create_all()\n    ensure_schema()'], cwd=workdir, env=env, check=True, capture_output=True)
+    port = free_port()
+    server = subprocess.Popen(['gunicorn', '--worker-class', 'geventwebsocket.gunicorn.workers.GeventWebSocketWorker', '-w', str(workers), '-b', f'127.0.0.1:{port}', '--graceful-timeout', '2', 'GChat:app'], cwd=workdir, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    base = f'http://127.0.0.1:{port}'
+    try:
+        wait_for(base + '/')
+        owner, _ = connect(base, 'owner')
+        owner.post(f'{base}/create_channel', data={'channel_name': 'general', 'is_private': 'false'})
+        received = [0] * clients_total
+        balance_updates = []
+        clients = []
+        for i in range(clients_total):
+            _, client = connect(base, f'u{i}')
+            client.on('new_message', lambda payload, i=i: received.__setitem__(i, received[i] + 1))
+            client.on('stars_balance_update', lambda payload: balance_updates.append(payload['username']))
+            client.emit('join', {'room': 'general'})
+            clients.append(client)
+        time.sleep(1)
+
+        # HTTP-маршрут на одном воркере должен достать сокет получателя на любом другом
+        sender_http, sender = connect(base, 'sender')
+        for i in range(clients_total):
+            sender.emit('friend_request_send', {'to_username': f'u{i}'})
+            time.sleep(0.05)
+            clients[i].emit('friend_request_respond', {'from_username': 'sender', 'action': 'accept'})
+        time.sleep(1)
+        # У нового пользователя 100 звёзд: хватает на 100 получателей по одной
+        paid = {f'u{i}' for i in range(clients_total) if sender_http.post(f'{base}/send_stars', json={'to_username': f'u{i}', 'amount': 1}).ok}
+
+        expected = senders_total * per_sender
+        started = time.perf_counter()
+
+        def send(client, index):
+            for k in range(per_sender):
+                client.call('send_message', {'room': 'general', 'message': f's{index}-{k}'}, timeout=30)
+
+        threads = [threading.Thread(target=send, args=(clients[index], index)) for index in range(senders_total)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        deadline = time.monotonic() + 30
+        while min(received) < expected and time.monotonic() < deadline:
+            time.sleep(0.05)
+        elapsed = time.perf_counter() - started
+        delivered = sum(received)
+        stars_ok = len(set(balance_updates) & paid)
+        print(f'workers={workers} clients={clients_total} sent={expected} delivered={delivered}/{expected * clients_total} '
+              f'complete_clients={sum(r >= expected for r in received)}/{clients_total} send_stars_delivered={stars_ok}/{len(paid)} '
+              f'{delivered / elapsed:.0f} deliveries/s')
+        for client in clients + [sender]:
+            client.disconnect()
+    finally:
+        server.terminate()
+        try:
+            server.wait(10)
+        except subprocess.TimeoutExpired:
+            server.kill()
+            server.wait()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+redis_port = free_port()
+redis_server = TcpFakeServer(('127.0.0.1', redis_port), server_type='redis')
+threading.Thread(target=redis_server.serve_forever, daemon=True).start()
+for count in worker_counts:
+    run(count, f'redis://127.0.0.1:{redis_port}/0')
+redis_server.shutdown()
@@ -1,5 +1,7 @@
-from GChat import db, app
+from GChat import db, app, ensure_schema, presence
 
 with app.app_context():
       db.create_all()
+      ensure_schema()
+      presence.rebuild()
       print('Database tables created successfully.')